@@ -1,6 +1,24 @@
-from openai import OpenAI
+import hashlib
+import json
+import math
+import re
+from collections.abc import Callable
+from functools import lru_cache
 
-from config import OPENAI_API_KEY, ANALYST_MODEL, EDITOR_MODEL, CV_TEMPLATE
+from openai import OpenAI, OpenAIError
+
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_MAX_RETRIES,
+    OPENAI_TIMEOUT_SECONDS,
+    CV_MODEL,
+    FALLBACK_MODEL,
+    CV_TEMPLATE,
+    MAX_OUTPUT_TOKENS,
+    RESPONSE_CACHE_SIZE,
+    SEMANTIC_CACHE_THRESHOLD,
+    EMBEDDING_MODEL,
+)
 
 FORMATTING_RULES = """
 CRITICAL FORMATTING RULES:
@@ -8,66 +26,185 @@ CRITICAL FORMATTING RULES:
 - If information is not available, omit that line or section entirely. Never write "[Not specified]" or similar.
 - Each responsibility, achievement, or skill must be its own bullet point (separate line starting with "- ").
 - Do NOT concatenate multiple items on a single line separated by " - ".
+- Eliminate redundancies, but keep all real information intact.
 - Output ONLY clean markdown. No commentary, notes, or explanations.
 """
 
+# Static instructions, built once at import. They go first in the system
+# message so every request shares a byte-identical prefix, which OpenAI's
+# automatic prompt caching can reuse; only the CV text varies.
+TASK_INSTRUCTIONS = (
+    f"Extract all information from the CV provided by the user and format it "
+    f"as clean markdown. Include all job experiences and education details.\n\n"
+    f"{FORMATTING_RULES}\n\n"
+    f"Use this structure as a guide (replace placeholders with real data, "
+    f"omit any section where data is not available):\n\n"
+    f"{CV_TEMPLATE}"
+)
 
-def run_cv_pipeline(cv_text: str) -> str:
-    """Run two-step CV analysis and editing using the OpenAI API."""
-    client = OpenAI(api_key=OPENAI_API_KEY)
+SYSTEM_PROMPT = (
+    "You are a Senior CV Analyst and Editor. You extract and format all CV "
+    "information accurately into clean markdown, maintaining all "
+    "original content. You never invent or guess information. "
+    "Output only the final markdown, no commentary.\n\n"
+    + TASK_INSTRUCTIONS
+)
 
-    analyst_response = client.chat.completions.create(
-        model=ANALYST_MODEL,
-        temperature=0,
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a Senior CV Analyst. You extract and format all CV "
-                    "information accurately into clean markdown, maintaining all "
-                    "original content. You never invent or guess information."
-                ),
-            },
-            {
-                "role": "user",
-                "content": (
-                    f"Extract all information from the following CV and format it "
-                    f"as clean markdown. Include all job experiences and education details.\n\n"
-                    f"{FORMATTING_RULES}\n\n"
-                    f"Use this structure as a guide (replace placeholders with real data, "
-                    f"omit any section where data is not available):\n\n"
-                    f"{CV_TEMPLATE}\n\n"
-                    f"CV TEXT:\n{cv_text}"
-                ),
-            },
-        ],
+# A usable result opens with the candidate's name as an H1 and has no
+# placeholder left over from CV_TEMPLATE. Ordinary brackets ("Spanish
+# [Native]", "- [x] done") are fine; only the template's own phrases and
+# "not specified"-style fillers count. Unbracketed, a phrase is only flagged
+# as a whole template line, so "Verified the actual address of customers"
+# passes.
+_TITLE_RE = re.compile(r"\A\s*# \S")
+_PLACEHOLDER_RE = re.compile(
+    r"\[\s*(?:not (?:specified|available|provided)|n/?a|unknown"
+    r"|name of the person|company name|position title|institution name"
+    r"|degree title|certification name|start year|end year)\b[^\]]*\]"
+    r"|^[ \t]*(?:# name of the person"
+    r"|- \*\*[^*\n]+:\*\* actual (?:email|phone number|address|linkedin url|github url|url)"
+    r"|#{2,3} (?:company name|position title|institution name|degree title)"
+    r"|- start year - end year"
+    r"|brief professional summary paragraph\."
+    r"|\(repeat the above block for each job\))[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Models sometimes wrap the whole answer in a ```markdown fence.
+_FENCE_RE = re.compile(r"\A\s*```(?:markdown|md)?[ \t]*\n(.*?)\n?```\s*\Z", re.DOTALL)
+
+# Completions run at temperature 0, so an identical request can be answered
+# from memory. Keys hash the full request; oldest entries are evicted first.
+_RESPONSE_CACHE: dict[str, str] = {}
+
+
+def _cache_key(model: str, messages: list[dict]) -> str:
+    payload = json.dumps({"model": model, "messages": messages, "temperature": 0}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# (unit-length embedding of the CV text, result) pairs for near-duplicate lookups.
+_SEMANTIC_CACHE: list[tuple[list[float], str]] = []
+
+
+def _embed(text: str) -> list[float] | None:
+    """Embed text for the semantic cache; on API failure the tier is just skipped."""
+    try:
+        response = _get_client().embeddings.create(model=EMBEDDING_MODEL, input=text)
+    except OpenAIError:
+        return None
+    vector = response.data[0].embedding
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def _semantic_lookup(embedding: list[float]) -> str | None:
+    best_score, best_result = 0.0, None
+    for cached_embedding, result in _SEMANTIC_CACHE:
+        score = sum(a * b for a, b in zip(embedding, cached_embedding))
+        if score > best_score:
+            best_score, best_result = score, result
+    return best_result if best_score >= SEMANTIC_CACHE_THRESHOLD else None
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> OpenAI:
+    """Return a process-wide client so its HTTP connection pool is reused across runs."""
+    return OpenAI(
+        api_key=OPENAI_API_KEY,
+        max_retries=OPENAI_MAX_RETRIES,
+        timeout=OPENAI_TIMEOUT_SECONDS,
     )
-    draft_markdown = analyst_response.choices[0].message.content
 
-    editor_response = client.chat.completions.create(
-        model=EDITOR_MODEL,
+
+def _complete(
+    model: str,
+    messages: list[dict],
+    on_update: Callable[[str], None] | None = None,
+) -> tuple[str, str | None]:
+    """Return (content, finish_reason).
+
+    With on_update, the response is streamed and on_update receives the text
+    so far each time a line completes, and once more with the full text.
+    """
+    request = dict(
+        model=model,
         temperature=0,
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a Senior CV Editor. You clean up CV markdown formatting. "
-                    "Output only the final markdown, no commentary."
-                ),
-            },
-            {
-                "role": "user",
-                "content": (
-                    f"Review and clean up the following CV markdown:\n\n"
-                    f"1. Remove any remaining square brackets [] or placeholder text.\n"
-                    f"2. Remove sections that are empty or have no real data.\n"
-                    f"3. Eliminate redundancies.\n"
-                    f"4. Ensure each responsibility/achievement is a separate bullet point.\n"
-                    f"5. Keep all real information intact.\n\n"
-                    f"{FORMATTING_RULES}\n\n"
-                    f"CV MARKDOWN:\n{draft_markdown}"
-                ),
-            },
-        ],
+        max_completion_tokens=MAX_OUTPUT_TOKENS,
+        messages=messages,
+    )
+    if on_update is None:
+        choice = _get_client().chat.completions.create(**request).choices[0]
+        return choice.message.content or "", choice.finish_reason
+
+    parts = []
+    finish_reason = None
+    for chunk in _get_client().chat.completions.create(**request, stream=True):
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        delta = choice.delta.content
+        if delta:
+            parts.append(delta)
+            if "\n" in delta:
+                on_update("".join(parts))
+        finish_reason = choice.finish_reason or finish_reason
+    content = "".join(parts)
+    on_update(content)
+    return content, finish_reason
+
+
+def _strip_fence(content: str) -> str:
+    match = _FENCE_RE.match(content)
+    return match.group(1) if match else content
+
+
+def _is_acceptable(content: str, finish_reason: str | None) -> bool:
+    """Cheap structural check deciding whether the fallback model is needed."""
+    return (
+        finish_reason != "length"
+        and bool(_TITLE_RE.match(content))
+        and not _PLACEHOLDER_RE.search(content)
     )
-    return editor_response.choices[0].message.content
+
+
+def run_cv_pipeline(
+    cv_text: str,
+    on_update: Callable[[str], None] | None = None,
+) -> str:
+    """Format a CV with the fast model, retrying once on the fallback model if needed.
+
+    If on_update is given, the model output is streamed to it as partial
+    markdown; a fallback run restarts the stream from the beginning.
+    """
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"CV TEXT:\n{cv_text}"},
+    ]
+    key = _cache_key(CV_MODEL, messages)
+    cached = _RESPONSE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    embedding = _embed(cv_text) if SEMANTIC_CACHE_THRESHOLD else None
+    if embedding is not None:
+        cached = _semantic_lookup(embedding)
+        if cached is not None:
+            return cached
+
+    result, finish_reason = _complete(CV_MODEL, messages, on_update)
+    result = _strip_fence(result)
+    if not _is_acceptable(result, finish_reason):
+        result, finish_reason = _complete(FALLBACK_MODEL, messages, on_update)
+        result = _strip_fence(result)
+
+    # Only cache results that pass the check, so a bad answer is retried
+    # on the next run rather than served from memory.
+    if _is_acceptable(result, finish_reason):
+        if len(_RESPONSE_CACHE) >= RESPONSE_CACHE_SIZE:
+            _RESPONSE_CACHE.pop(next(iter(_RESPONSE_CACHE)), None)
+        _RESPONSE_CACHE[key] = result
+        if embedding is not None:
+            if len(_SEMANTIC_CACHE) >= RESPONSE_CACHE_SIZE:
+                _SEMANTIC_CACHE.pop(0)
+            _SEMANTIC_CACHE.append((embedding, result))
+    return result
@@ -1,17 +1,41 @@
+import hashlib
+from datetime import date
+
 import streamlit as st
 
 from config import OPENAI_API_KEY, MAX_FILE_SIZE_MB, MAX_FILE_SIZE_BYTES
 from extraction import extract_text_from_file
-from pdf_generator import markdown_to_pdf
+from pdf_generator import markdown_to_pdf, warm_up
 from agents import run_cv_pipeline
 
 
+def _file_hash(file_bytes: bytes) -> str:
+    return hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _extract_text_cached(file_hash: str, file_name: str, _file_bytes: bytes) -> str:
+    """Extract text once per distinct upload.
+
+    The cache is keyed on the precomputed content hash; the leading underscore
+    stops Streamlit from hashing the raw bytes a second time.
+    """
+    return extract_text_from_file(file_name, _file_bytes)
+
+
+@st.cache_resource(show_spinner=False)
+def _warm_up_pdf_renderer():
+    """Start the WeasyPrint warm-up once per process, not once per rerun."""
+    return warm_up()
+
+
 def main():
     if not OPENAI_API_KEY:
         st.error("OPENAI_API_KEY is not set. Please set it in your environment or .env file.")
         return
 
     st.title("CV Format Standardizer")
+    _warm_up_pdf_renderer()
 
     if "result" not in st.session_state:
         st.session_state["result"] = None
@@ -19,8 +43,13 @@ def main():
         st.session_state["current_markdown"] = None
     if "processed" not in st.session_state:
         st.session_state["processed"] = False
-    if "last_file_name" not in st.session_state:
-        st.session_state["last_file_name"] = None
+    if "file_hash" not in st.session_state:
+        st.session_state["file_hash"] = None
+    if "extracted_texts" not in st.session_state:
+        st.session_state["extracted_texts"] = {}
+    if "pdf_key" not in st.session_state:
+        st.session_state["pdf_key"] = None
+        st.session_state["pdf_bytes"] = None
 
     uploaded_file = st.file_uploader(
         "Choose a CV file (txt, pdf, or docx)", type=["txt", "pdf", "docx"]
@@ -31,24 +60,30 @@ def main():
             st.error(f"File exceeds the {MAX_FILE_SIZE_MB} MB limit. Please upload a smaller file.")
             return
 
-        if st.session_state["last_file_name"] != uploaded_file.name:
+        file_bytes = uploaded_file.getvalue()
+        file_hash = _file_hash(file_bytes)
+        if st.session_state["file_hash"] != file_hash:
             st.session_state["result"] = None
             st.session_state["current_markdown"] = None
             st.session_state["processed"] = False
-            st.session_state["last_file_name"] = uploaded_file.name
+            st.session_state["file_hash"] = file_hash
 
     if not st.session_state["processed"]:
         if st.button("Process", disabled=uploaded_file is None):
             with st.status("Processing CV...", expanded=True) as status:
-                st.write("Extracting text from file...")
-                cv_text = extract_text_from_file(uploaded_file)
+                cv_text = st.session_state["extracted_texts"].get(file_hash)
+                if cv_text is None:
+                    st.write("Extracting text from file...")
+                    cv_text = _extract_text_cached(file_hash, uploaded_file.name, file_bytes)
+                    st.session_state["extracted_texts"][file_hash] = cv_text
                 if not cv_text.strip():
                     st.error("Could not extract any text from the uploaded file.")
                     return
 
-                st.write("Analyzing and formatting CV (this may take 1-2 minutes)...")
+                st.write("Analyzing and formatting CV...")
+                preview = st.empty()
                 try:
-                    result = run_cv_pipeline(cv_text)
+                    result = run_cv_pipeline(cv_text, on_update=preview.markdown)
                 except Exception as e:
                     st.error(f"Failed to process CV: {e}")
                     return
@@ -64,7 +99,7 @@ def main():
             st.session_state["processed"] = False
             st.session_state["result"] = None
             st.session_state["current_markdown"] = None
-            st.session_state["last_file_name"] = None
+            st.session_state["file_hash"] = None
             st.rerun()
 
         st.markdown(st.session_state["current_markdown"])
@@ -84,10 +119,21 @@ def main():
                 st.rerun()
 
         with col2:
-            pdf_bytes = markdown_to_pdf(edited_markdown)
+            # Every widget interaction reruns the script; only render again
+            # when the markdown or the footer date actually changed.
+            pdf_key = (edited_markdown, date.today())
+            if st.session_state["pdf_key"] != pdf_key:
+                try:
+                    st.session_state["pdf_bytes"] = markdown_to_pdf(edited_markdown)
+                    st.session_state["pdf_key"] = pdf_key
+                except (ImportError, OSError) as e:
+                    # WeasyPrint is imported on first render, so a missing
+                    # package or Pango/Cairo library shows up here.
+                    st.error(f"PDF generation is unavailable: {e}")
+                    return
             st.download_button(
                 label="Download PDF",
-                data=pdf_bytes,
+                data=st.session_state["pdf_bytes"],
                 file_name="cv_output.pdf",
                 mime="application/pdf",
             )
@@ -9,8 +9,24 @@ LOGO_URL = os.environ.get("LOGO_URL", "")
 MAX_FILE_SIZE_MB = 10
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
-ANALYST_MODEL = "gpt-4o"
-EDITOR_MODEL = "gpt-4o-mini"
+CV_MODEL = "gpt-4o-mini"
+# Used only when CV_MODEL's output fails the structural check in agents.py.
+FALLBACK_MODEL = "gpt-4o"
+# Generous enough for a multi-page CV, while bounding a runaway response.
+MAX_OUTPUT_TOKENS = 4096
+# Number of CV results kept in memory for identical re-submissions.
+RESPONSE_CACHE_SIZE = 64
+
+# Reuse the result of a previous CV whose embedding has at least this cosine
+# similarity. Off by default: a near-duplicate may differ in exactly the
+# detail the user changed, e.g. a new phone number.
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD") or 0)
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# The OpenAI client retries rate limits (429), timeouts, and 5xx errors with
+# exponential backoff that honours Retry-After.
+OPENAI_MAX_RETRIES = 4
+OPENAI_TIMEOUT_SECONDS = 120
 
 CV_TEMPLATE = """\
 # Name of the person
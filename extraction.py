@@ -1,27 +1,137 @@
+import io
+import multiprocessing
 import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
 
-from docx import Document
-from PyPDF2 import PdfReader
+import pypdfium2 as pdfium
 
+# Up to this page count, starting worker processes costs more than it saves.
+SERIAL_PDF_MAX_PAGES = 10
+MAX_PDF_WORKERS = 4
 
-def extract_text_from_file(uploaded_file) -> str:
-    """Extract text from a .txt, .docx, or .pdf file."""
-    ext = os.path.splitext(uploaded_file.name)[1].lower()
+# PDFium is not thread-safe, and Streamlit runs each session's script on its
+# own thread, so every use of it in this process is serialised.
+_PDFIUM_LOCK = threading.Lock()
 
-    if ext == ".txt":
-        return uploaded_file.read().decode("utf-8")
+# Forking a multi-threaded process (Streamlit's server) can deadlock the
+# child, so workers start from a clean forkserver, or spawn where that
+# start method is unavailable.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
 
-    if ext == ".docx":
-        doc = Document(uploaded_file)
-        return "\n".join(para.text for para in doc.paragraphs)
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_PARAGRAPH = _W + "p"
+_W_RUN = _W + "r"
+_W_TEXT = _W + "t"
+_W_TAB = _W + "tab"
+_W_BREAKS = (_W + "br", _W + "cr")
+# Text boxes are stored twice: as DrawingML under mc:Choice and as VML
+# under mc:Fallback. Only the Choice copy is read.
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
 
-    if ext == ".pdf":
-        reader = PdfReader(uploaded_file)
-        pages = []
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                pages.append(text)
-        return "\n".join(pages)
 
+def _page_text(page) -> str:
+    return page.get_textpage().get_text_range()
+
+
+# Each pool worker opens the document once, in its initializer, so the file
+# bytes cross the process boundary once per worker rather than once per page.
+_worker_pdf = None
+
+
+def _init_pdf_worker(file_bytes: bytes) -> None:
+    global _worker_pdf
+    _worker_pdf = pdfium.PdfDocument(file_bytes)
+
+
+def _extract_pdf_page(page_index: int) -> str:
+    return _page_text(_worker_pdf[page_index])
+
+
+def _extract_txt(file_bytes: bytes) -> str:
+    return file_bytes.decode("utf-8")
+
+
+def _extract_docx(file_bytes: bytes) -> str:
+    """Stream <w:t> text out of word/document.xml, one line per paragraph.
+
+    Tabs and breaks only count inside runs; <w:tab> also appears in
+    paragraph properties as a tab-stop definition. Paragraphs nested in a
+    text box become their own lines, after the paragraph that anchors it.
+    """
+    paragraphs = []
+    # One (parts, nested lines) entry per open <w:p>; text boxes nest them.
+    stack = []
+    run_depth = 0
+    skip_depth = 0
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as docx, docx.open("word/document.xml") as xml:
+        for event, node in ElementTree.iterparse(xml, events=("start", "end")):
+            tag = node.tag
+            if tag == _MC_FALLBACK:
+                skip_depth += 1 if event == "start" else -1
+                if event == "end":
+                    node.clear()
+                continue
+            if skip_depth:
+                continue
+            if event == "start":
+                if tag == _W_RUN:
+                    run_depth += 1
+                elif tag == _W_PARAGRAPH:
+                    stack.append(([], []))
+            elif tag == _W_TEXT:
+                stack[-1][0].append(node.text or "")
+            elif tag == _W_RUN:
+                run_depth -= 1
+            elif run_depth and tag == _W_TAB:
+                stack[-1][0].append("\t")
+            elif run_depth and tag in _W_BREAKS:
+                stack[-1][0].append("\n")
+            elif tag == _W_PARAGRAPH:
+                parts, nested = stack.pop()
+                lines = ["".join(parts), *nested]
+                (stack[-1][1] if stack else paragraphs).extend(lines)
+                node.clear()
+    return "\n".join(paragraphs)
+
+
+def _extract_pdf(file_bytes: bytes) -> str:
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(file_bytes)
+        try:
+            num_pages = len(pdf)
+            if num_pages <= SERIAL_PDF_MAX_PAGES:
+                pages = [_page_text(page) for page in pdf]
+            else:
+                workers = min(os.cpu_count() or 1, MAX_PDF_WORKERS)
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=_MP_CONTEXT,
+                    initializer=_init_pdf_worker,
+                    initargs=(file_bytes,),
+                ) as executor:
+                    pages = list(executor.map(_extract_pdf_page, range(num_pages)))
+        finally:
+            pdf.close()
+    return "\n".join(text for text in pages if text)
+
+
+def _extract_unsupported(file_bytes: bytes) -> str:
     return ""
+
+
+_EXTRACTORS = {
+    ".txt": _extract_txt,
+    ".docx": _extract_docx,
+    ".pdf": _extract_pdf,
+}
+
+
+def extract_text_from_file(file_name: str, file_bytes: bytes) -> str:
+    """Extract text from the bytes of a .txt, .docx, or .pdf file."""
+    ext = os.path.splitext(file_name)[1].lower()
+    return _EXTRACTORS.get(ext, _extract_unsupported)(file_bytes)
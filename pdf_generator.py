@@ -1,12 +1,61 @@
-import io
+import base64
+import http.client
 import re
+import threading
+import urllib.request
 from datetime import date
+from functools import lru_cache
 
-import markdown as md
-from weasyprint import HTML, CSS
+import mistune
 
 from config import LOGO_URL
 
+# WeasyPrint loads Pango/Cairo through cffi on import, which is slow, so it
+# is imported on first render (or by warm_up) rather than at app start. A
+# missing package or system library therefore surfaces as ImportError or
+# OSError from markdown_to_pdf, not here.
+
+_MARKDOWN = mistune.create_markdown(escape=False, plugins=["strikethrough", "table"])
+_EMPTY_PARAGRAPH_RE = re.compile(r"<p>\s*</p>\s*")
+
+_BASE_STYLESHEET = """
+    body {
+        font-family: "Arial", "Liberation Sans", sans-serif;
+    }
+    table {
+        table-layout: fixed;
+        width: 100%;
+    }
+"""
+
+
+# Parsing a stylesheet is one of WeasyPrint's most expensive steps, so the
+# static rules and the font configuration are built once per process and
+# shared by every render. The configuration wraps a single Pango font map,
+# which must not be used from two threads at once, and Streamlit runs each
+# session on its own thread, so renders are serialised by _RENDER_LOCK.
+_RENDER_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _font_config():
+    from weasyprint.text.fonts import FontConfiguration
+
+    return FontConfiguration()
+
+
+@lru_cache(maxsize=1)
+def _base_css():
+    from weasyprint import CSS
+
+    return CSS(string=_BASE_STYLESHEET, font_config=_font_config())
+
+
+# Rendering never touches the network: the logo is inlined as a data: URI
+# and any other URL (e.g. an image added while editing) is refused.
+_ALLOWED_PROTOCOLS = ("data",)
+LOGO_FETCH_TIMEOUT_SECONDS = 10
+
 
 def _sanitize_url(url: str) -> str:
     """Only allow http/https URLs to prevent injection."""
@@ -16,23 +65,40 @@ def _sanitize_url(url: str) -> str:
     return ""
 
 
-def markdown_to_pdf(markdown_text: str) -> bytes:
-    """Convert markdown text to styled PDF bytes."""
-    html_content = md.markdown(markdown_text)
-
-    safe_logo = _sanitize_url(LOGO_URL)
-    if safe_logo:
-        html_content = (
-            f'<div style="text-align: right;">'
-            f'<img src="{safe_logo}" alt="Logo" style="max-width: 120px;">'
-            f'</div>\n' + html_content
-        )
+@lru_cache(maxsize=1)
+def _fetch_logo_html(url: str) -> str:
+    """Download the logo once per process and return it as a ready-made HTML header.
 
-    current_date = date.today().strftime("%B %d, %Y")
-    css = CSS(string=f"""
-        body {{
-            font-family: Arial, sans-serif;
-        }}
+    Failures raise, so they are not cached and the next render retries.
+    """
+    with urllib.request.urlopen(url, timeout=LOGO_FETCH_TIMEOUT_SECONDS) as response:
+        content_type = response.headers.get_content_type()
+        payload = base64.b64encode(response.read()).decode("ascii")
+    return (
+        f'<div style="text-align: right;">'
+        f'<img src="data:{content_type};base64,{payload}" alt="Logo" style="max-width: 120px;">'
+        f'</div>\n'
+    )
+
+
+_SAFE_LOGO_URL = _sanitize_url(LOGO_URL)
+
+
+def _logo_html() -> str:
+    if not _SAFE_LOGO_URL:
+        return ""
+    try:
+        return _fetch_logo_html(_SAFE_LOGO_URL)
+    except (OSError, http.client.HTTPException):
+        return ""
+
+
+@lru_cache(maxsize=2)
+def _date_css(current_date: str):
+    """Parse the footer rule once per day; it is the only date-dependent CSS."""
+    from weasyprint import CSS
+
+    return CSS(string=f"""
         @page {{
             @bottom-right {{
                 content: "Date: {current_date}";
@@ -40,7 +106,61 @@ def markdown_to_pdf(markdown_text: str) -> bytes:
         }}
     """)
 
-    pdf_buffer = io.BytesIO()
-    HTML(string=html_content).write_pdf(target=pdf_buffer, stylesheets=[css])
-    pdf_buffer.seek(0)
-    return pdf_buffer.read()
+
+def _markdown_to_html(markdown_text: str) -> str:
+    """Render markdown to the minimal HTML WeasyPrint needs, without empty paragraphs."""
+    return _EMPTY_PARAGRAPH_RE.sub("", _MARKDOWN(markdown_text))
+
+
+def _write_pdf(html_content: str, current_date: str) -> bytes:
+    """Render HTML to PDF bytes, one render at a time (see _RENDER_LOCK)."""
+    from weasyprint import HTML, URLFetcher
+
+    url_fetcher = URLFetcher(allowed_protocols=_ALLOWED_PROTOCOLS)
+    with _RENDER_LOCK:
+        return HTML(string=html_content, url_fetcher=url_fetcher).write_pdf(
+            stylesheets=[_base_css(), _date_css(current_date)],
+            font_config=_font_config(),
+        )
+
+
+def _current_date() -> str:
+    return date.today().strftime("%B %d, %Y")
+
+
+@lru_cache(maxsize=8)
+def _render_pdf(markdown_text: str, current_date: str) -> bytes:
+    return _write_pdf(_logo_html() + _markdown_to_html(markdown_text), current_date)
+
+
+def markdown_to_pdf(markdown_text: str) -> bytes:
+    """Convert markdown text to styled PDF bytes.
+
+    Streamlit calls this on every rerun, so identical text rendered on the
+    same day is served from a small in-memory cache.
+    """
+    return _render_pdf(markdown_text, _current_date())
+
+
+def _warm_up_render() -> None:
+    # Goes through _write_pdf, so it holds the render lock like any session
+    # render, and skips _render_pdf so the throwaway PDF takes no cache slot.
+    # A broken install is reported by the first real render; the warm-up
+    # thread just stays quiet instead of dumping a traceback to the console.
+    try:
+        _write_pdf(_logo_html() + _markdown_to_html("# CV"), _current_date())
+    except (ImportError, OSError):
+        pass
+
+
+def warm_up() -> threading.Thread:
+    """Render a throwaway PDF in the background.
+
+    The first render in a process pays for importing WeasyPrint, Pango and
+    fontconfig initialisation, and the logo download; doing it while the user
+    is still uploading keeps that cost off the first real render. It takes
+    the same lock as every render, so a session rendering meanwhile waits.
+    """
+    thread = threading.Thread(target=_warm_up_render, daemon=True)
+    thread.start()
+    return thread
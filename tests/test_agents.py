@@ -0,0 +1,155 @@
+from types import SimpleNamespace
+
+import pytest
+
+import agents
+
+
+class FakeClient:
+    def __init__(self, reply: str = "# Jane Doe", replies: dict | None = None):
+        self.reply = reply
+        self.replies = replies or {}
+        self.calls = []
+        self.embedding_calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    def _embed(self, model, input):
+        self.embedding_calls.append(input)
+        # Texts sharing their first word embed to the same direction.
+        vector = [1.0, 0.0] if input.startswith("Jane") else [0.0, 1.0]
+        return SimpleNamespace(data=[SimpleNamespace(embedding=vector)])
+
+    def _create(self, stream=False, **kwargs):
+        self.calls.append(kwargs)
+        content = self.replies.get(kwargs["model"], self.reply)
+        if stream:
+            return self._stream(content)
+        message = SimpleNamespace(content=content)
+        choice = SimpleNamespace(message=message, finish_reason="stop")
+        return SimpleNamespace(choices=[choice])
+
+    @staticmethod
+    def _stream(content: str):
+        for line in content.splitlines(keepends=True):
+            delta = SimpleNamespace(content=line)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+        yield SimpleNamespace(choices=[SimpleNamespace(
+            delta=SimpleNamespace(content=None), finish_reason="stop"
+        )])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(agents, "_get_client", lambda: client)
+    monkeypatch.setattr(agents, "_RESPONSE_CACHE", {})
+    monkeypatch.setattr(agents, "_SEMANTIC_CACHE", [])
+    monkeypatch.setattr(agents, "SEMANTIC_CACHE_THRESHOLD", 0)
+    return client
+
+
+def test_pipeline_keeps_static_instructions_in_system_prefix(client):
+    assert agents.run_cv_pipeline("Jane Doe, engineer") == "# Jane Doe"
+
+    messages = client.calls[0]["messages"]
+    assert messages[0] == {"role": "system", "content": agents.SYSTEM_PROMPT}
+    assert agents.TASK_INSTRUCTIONS in messages[0]["content"]
+    assert messages[1] == {"role": "user", "content": "CV TEXT:\nJane Doe, engineer"}
+
+
+def test_pipeline_reuses_response_for_identical_cv(client):
+    first = agents.run_cv_pipeline("Jane Doe, engineer")
+    second = agents.run_cv_pipeline("Jane Doe, engineer")
+
+    assert first == second == "# Jane Doe"
+    assert len(client.calls) == 1
+
+
+def test_pipeline_calls_model_for_different_cv(client):
+    agents.run_cv_pipeline("Jane Doe, engineer")
+    agents.run_cv_pipeline("John Roe, designer")
+
+    assert len(client.calls) == 2
+
+
+def test_semantic_cache_is_off_by_default(client):
+    agents.run_cv_pipeline("Jane Doe, engineer")
+    agents.run_cv_pipeline("Jane Doe, senior engineer")
+
+    assert client.embedding_calls == []
+    assert len(client.calls) == 2
+
+
+def test_semantic_cache_reuses_near_duplicate(client, monkeypatch):
+    monkeypatch.setattr(agents, "SEMANTIC_CACHE_THRESHOLD", 0.95)
+
+    agents.run_cv_pipeline("Jane Doe, engineer")
+    assert agents.run_cv_pipeline("Jane Doe, senior engineer") == "# Jane Doe"
+    agents.run_cv_pipeline("John Roe, designer")
+
+    assert len(client.calls) == 2
+
+
+def test_pipeline_uses_fallback_model_for_placeholder_output(client):
+    client.replies = {agents.CV_MODEL: "# [Name of the person]\n\n- **Email:** [Not specified]", agents.FALLBACK_MODEL: "# Jane Doe"}
+
+    assert agents.run_cv_pipeline("Jane Doe, engineer") == "# Jane Doe"
+    assert [call["model"] for call in client.calls] == [agents.CV_MODEL, agents.FALLBACK_MODEL]
+
+
+def test_links_do_not_trigger_fallback(client):
+    client.reply = "# Jane Doe\n\n- **Github:** [jdoe](https://github.com/jdoe)"
+
+    agents.run_cv_pipeline("Jane Doe, engineer")
+    assert len(client.calls) == 1
+
+
+def test_ordinary_brackets_do_not_trigger_fallback(client):
+    client.reply = "# Jane Doe\n\n- Spanish [Native]\n- Python [Advanced]\n- [x] done"
+
+    agents.run_cv_pipeline("Jane Doe, engineer")
+    assert len(client.calls) == 1
+
+
+def test_template_phrases_in_real_text_do_not_trigger_fallback(client):
+    client.reply = "# Jane Doe\n\n- Verified the actual address of customers"
+
+    agents.run_cv_pipeline("Jane Doe, engineer")
+    assert len(client.calls) == 1
+
+
+def test_unfilled_template_line_triggers_fallback(client):
+    client.replies = {
+        agents.CV_MODEL: "# Jane Doe\n\n- **Email:** actual email",
+        agents.FALLBACK_MODEL: "# Jane Doe",
+    }
+
+    assert agents.run_cv_pipeline("Jane Doe, engineer") == "# Jane Doe"
+    assert len(client.calls) == 2
+
+
+def test_pipeline_unwraps_fenced_output(client):
+    client.reply = "```markdown\n# Jane Doe\n\n- Python\n```"
+
+    assert agents.run_cv_pipeline("Jane Doe, engineer") == "# Jane Doe\n\n- Python"
+    assert len(client.calls) == 1
+
+
+def test_unacceptable_fallback_result_is_not_cached(client):
+    client.reply = "Name of the person"
+
+    agents.run_cv_pipeline("Jane Doe, engineer")
+    agents.run_cv_pipeline("Jane Doe, engineer")
+    assert len(client.calls) == 4
+
+
+def test_pipeline_streams_partial_markdown(client):
+    client.reply = "# Jane Doe\n\n- Python\n"
+    updates = []
+
+    result = agents.run_cv_pipeline("Jane Doe, engineer", on_update=updates.append)
+
+    assert result == "# Jane Doe\n\n- Python\n"
+    assert updates[0] == "# Jane Doe\n"
+    assert updates[-1] == result
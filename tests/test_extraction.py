@@ -1,27 +1,99 @@
 import io
+import zipfile
+import extraction
 from extraction import extract_text_from_file
 
 
-class FakeFile:
-    def __init__(self, name: str, content: bytes):
-        self.name = name
-        self._buf = io.BytesIO(content)
+def test_extract_txt():
+    result = extract_text_from_file("resume.txt", b"John Doe\nSoftware Engineer")
+    assert "John Doe" in result
+    assert "Software Engineer" in result
 
-    def read(self):
-        return self._buf.read()
 
-    def seek(self, n):
-        self._buf.seek(n)
+def _make_docx(body_xml: str) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+            'wordprocessingml/2006/main" xmlns:mc="http://schemas.openxmlformats.org/'
+            'markup-compatibility/2006"><w:body>' + body_xml + "</w:body></w:document>",
+        )
+    return buf.getvalue()
 
 
-def test_extract_txt():
-    f = FakeFile("resume.txt", b"John Doe\nSoftware Engineer")
-    result = extract_text_from_file(f)
-    assert "John Doe" in result
-    assert "Software Engineer" in result
+def test_extract_docx():
+    body = (
+        '<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+        "<w:r><w:t>John </w:t></w:r><w:r><w:t>Doe</w:t></w:r></w:p>"
+        "<w:p><w:r><w:t>Python</w:t><w:tab/><w:t>Expert</w:t></w:r></w:p>"
+        "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Spanish</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+    )
+    assert extract_text_from_file("resume.docx", _make_docx(body)) == "John Doe\nPython\tExpert\nSpanish"
+
+
+def test_extract_docx_text_box():
+    box = "<w:txbxContent><w:p><w:r><w:t>Skills: Python</w:t></w:r></w:p></w:txbxContent>"
+    body = (
+        "<w:p><w:r><w:t>Jane Doe</w:t></w:r><w:r><mc:AlternateContent>"
+        f"<mc:Choice><w:drawing>{box}</w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict>{box}</w:pict></mc:Fallback>"
+        '</mc:AlternateContent></w:r><w:r><w:t xml:space="preserve"> Engineer</w:t></w:r></w:p>'
+    )
+    assert extract_text_from_file("resume.docx", _make_docx(body)) == "Jane Doe Engineer\nSkills: Python"
+
+
+def test_extract_is_repeatable():
+    data = b"John Doe"
+    assert extract_text_from_file("resume.txt", data) == extract_text_from_file("resume.txt", data)
 
 
 def test_extract_unsupported():
-    f = FakeFile("resume.xyz", b"anything")
-    result = extract_text_from_file(f)
+    result = extract_text_from_file("resume.xyz", b"anything")
     assert result == ""
+
+
+def _make_pdf(page_texts: list[str]) -> bytes:
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    n = len(page_texts)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(n))
+        + b"] /Count %d >>" % n,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(page_texts):
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode("latin-1") + b") Tj ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref_offset
+    )
+    return out
+
+
+def test_extract_pdf():
+    result = extract_text_from_file("resume.pdf", _make_pdf(["John Doe", "Software Engineer"]))
+    assert result.index("John Doe") < result.index("Software Engineer")
+
+
+def test_extract_pdf_parallel_keeps_page_order(monkeypatch):
+    monkeypatch.setattr(extraction, "SERIAL_PDF_MAX_PAGES", 2)
+    texts = [f"Page {i}" for i in range(6)]
+    result = extract_text_from_file("resume.pdf", _make_pdf(texts))
+    assert [line.strip() for line in result.splitlines()] == texts
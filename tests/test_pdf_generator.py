@@ -1,4 +1,4 @@
-from pdf_generator import _sanitize_url
+from pdf_generator import _markdown_to_html, _sanitize_url
 
 
 def test_sanitize_valid_https():
@@ -23,3 +23,10 @@ def test_sanitize_empty():
 
 def test_sanitize_with_spaces():
     assert _sanitize_url("  https://example.com/logo.png  ") == "https://example.com/logo.png"
+
+
+def test_markdown_to_html_strips_empty_paragraphs():
+    html = _markdown_to_html("# Jane Doe\n\n<p></p>\n\n- Python")
+    assert "<p></p>" not in html
+    assert "<h1>Jane Doe</h1>" in html
+    assert "<li>Python</li>" in html